@@ -21,7 +21,40 @@ function connectNative() {
 
     nativePort.onMessage.addListener((message) => {
       console.log('Native message received:', message);
-      // Route response to pending callback
+
+      // Stream lines (start_stream) are unsolicited: broadcast them to
+      // extension views instead of consuming a pending callback
+      if (message.status === 'stream') {
+        chrome.runtime.sendMessage({ type: 'nativeStream', ...message })
+          .catch(() => {
+            // Ignore errors if no listeners (side panel not open)
+          });
+        return;
+      }
+
+      // Partial output (run_command with stream: true) precedes the final
+      // reply for the same req_id; forward it without resolving the request
+      if (message.status === 'partial') {
+        chrome.runtime.sendMessage({ type: 'nativePartial', ...message })
+          .catch(() => {
+            // Ignore errors if no listeners
+          });
+        return;
+      }
+
+      // Route response to its request by req_id. The host handles requests
+      // concurrently, so tagged replies can arrive out of order.
+      if (message.req_id !== undefined) {
+        const callback = pendingCallbacks.get(message.req_id);
+        if (callback) {
+          pendingCallbacks.delete(message.req_id);
+          callback.resolve(message);
+        }
+        // Otherwise the request already timed out; drop the late reply
+        return;
+      }
+
+      // Older hosts don't echo req_id: route to the oldest pending callback
       const callbacks = Array.from(pendingCallbacks.values());
       if (callbacks.length > 0) {
         const callback = callbacks[0];
@@ -71,7 +104,7 @@ function sendNativeMessage(message) {
         }
       }, 30000); // 30 second timeout
 
-      port.postMessage(message);
+      port.postMessage({ ...message, req_id: id });
     } catch (e) {
       reject(e);
     }
@@ -226,6 +226,7 @@ let pollingTimer = null;
 let heartbeatTimer = null;
 let dashboardTimer = null;
 let lastResponseLength = 0; // Track how much we've already rendered
+let responseOffset = 0; // Same position as a byte offset, for incremental polls
 let approvedTools = []; // Tools approved for re-run
 let blockedCommandsData = {}; // Store blocked commands for copy functionality
 let lastAppliedProfile = null; // Track which profile was last written to server
@@ -632,8 +633,8 @@ let dashboardCache = {};
 function startDashboardPolling() {
   if (dashboardTimer) return;
 
-  // Immediate first poll
-  pollDashboardHeartbeats();
+  // Immediate first poll, once connections to all servers are warm
+  warmupConnections().finally(() => pollDashboardHeartbeats());
 
   // Poll every 10 seconds
   dashboardTimer = setInterval(() => {
@@ -651,6 +652,32 @@ function stopDashboardPolling() {
   }
 }
 
+/**
+ * Open SSH connections to every dashboard server in parallel, so the
+ * sequential heartbeat polls don't each pay a cold handshake
+ */
+async function warmupConnections() {
+  const seen = new Set();
+  const targets = [];
+  for (const { server } of interactiveProjects) {
+    const sshTarget = server.sshType === 'direct'
+      ? `${server.username}@${server.host}`
+      : server.sshTarget;
+    if (sshTarget && !seen.has(sshTarget)) {
+      seen.add(sshTarget);
+      targets.push({ ssh_target: sshTarget });
+    }
+  }
+  if (targets.length === 0) return;
+
+  try {
+    // Older hosts answer with "Unknown action"; polling works either way
+    await queuedSendNativeMessage({ action: 'warmup', targets });
+  } catch (e) {
+    console.log('[Warmup] Failed:', e);
+  }
+}
+
 /**
  * Poll heartbeats for all interactive projects
  */
@@ -1181,7 +1208,7 @@ function qdSetStatus(message, type = 'info') {
 }
 
 /**
- * Send file via Quick Drop (SCP to project directory)
+ * Send file via Quick Drop (over SSH to project directory)
  */
 async function qdSendFile() {
   if (!currentServer || !currentProject) {
@@ -2018,6 +2045,7 @@ function resetState() {
   currentPhase = null;
   sessionId = null;
   lastResponseLength = 0;
+  responseOffset = 0;
   approvedTools = [];
   lastAppliedProfile = null; // Reset so settings are written fresh for new project
   activityHistory = []; // Clear in-memory history (will be loaded from storage for new project)
@@ -2251,7 +2279,7 @@ async function handleStopClick() {
                 // Process any new content
                 if (content.length > lastResponseLength) {
                   const newContent = content.substring(lastResponseLength);
-                  lastResponseLength = content.length;
+                  markResponseRendered(content);
                   const newLines = newContent.trim().split('\n');
                   for (const newLine of newLines) {
                     if (newLine.trim()) {
@@ -2310,7 +2338,7 @@ async function handleStopClick() {
               const content = lateResponse.content;
               if (content.length > lastResponseLength) {
                 const newContent = content.substring(lastResponseLength);
-                lastResponseLength = content.length;
+                markResponseRendered(content);
                 const lines = newContent.trim().split('\n');
                 for (const line of lines) {
                   if (line.trim()) {
@@ -2620,7 +2648,7 @@ function stopPolling() {
  */
 function startHeartbeatTimer() {
   stopHeartbeatTimer();
-  // Check heartbeat every 10 seconds (SSH calls need time, queue serializes them)
+  // Check heartbeat every 10 seconds (SSH calls need time)
   heartbeatTimer = setInterval(() => {
     checkHeartbeat();
   }, 10000);
@@ -2718,6 +2746,17 @@ async function checkHeartbeat() {
   }
 }
 
+/**
+ * Record that the response file has been rendered up to the end of content,
+ * the whole file as returned by poll_responses without an offset. A partly
+ * written last line is left to be read again once it is complete.
+ */
+function markResponseRendered(content) {
+  const rendered = content.substring(0, content.lastIndexOf('\n') + 1);
+  lastResponseLength = rendered.length;
+  responseOffset = new TextEncoder().encode(rendered).length;
+}
+
 /**
  * Poll for new responses
  */
@@ -2732,32 +2771,41 @@ async function pollResponses() {
 
   pollPending = true;
   try {
+    // Only ask for what was appended since the last poll
     const result = await queuedSendNativeMessage({
       action: 'poll_responses',
       ssh_target: getSshTarget(),
       remote_path: currentProject.path,
-      plan_id: currentPlanId
+      plan_id: currentPlanId,
+      offset: responseOffset
     });
 
     if (result.status === 'ok' && result.content) {
-      // Only process new content
-      const content = result.content;
-      if (content.length > lastResponseLength) {
-        const newContent = content.substring(lastResponseLength);
-        lastResponseLength = content.length;
-
-        // Parse and render new lines
-        const lines = newContent.trim().split('\n');
-        for (const line of lines) {
-          if (line.trim()) {
-            try {
-              const event = JSON.parse(line);
-              console.log('[Event] Received:', event.type, event.subtype || '', event);
-              renderEvent(event);
-            } catch (e) {
-              console.error('[Event] Failed to parse/render:', e.message || e, 'Line:', line.substring(0, 200));
-              // Skip malformed lines silently in UI
-            }
+      let newContent = result.content;
+      if (result.offset !== undefined) {
+        // Content is the complete lines after our offset
+        responseOffset = result.offset;
+        lastResponseLength += newContent.length;
+      } else if (newContent.length > lastResponseLength) {
+        // Older hosts ignore offset and return the whole file
+        const content = newContent;
+        newContent = content.substring(lastResponseLength);
+        markResponseRendered(content);
+      } else {
+        newContent = '';
+      }
+
+      // Parse and render new lines
+      const lines = newContent.trim().split('\n');
+      for (const line of lines) {
+        if (line.trim()) {
+          try {
+            const event = JSON.parse(line);
+            console.log('[Event] Received:', event.type, event.subtype || '', event);
+            renderEvent(event);
+          } catch (e) {
+            console.error('[Event] Failed to parse/render:', e.message || e, 'Line:', line.substring(0, 200));
+            // Skip malformed lines silently in UI
           }
         }
       }
@@ -3621,7 +3669,7 @@ async function catchUpOnTaskStatus() {
           currentPlanId = taskId;
           if (content.length > lastResponseLength) {
             const newContent = content.substring(lastResponseLength);
-            lastResponseLength = content.length;
+            markResponseRendered(content);
 
             const newLines = newContent.trim().split('\n');
             for (const line of newLines) {
@@ -3746,6 +3794,7 @@ function continueInSession() {
   currentPlanId = null;
   currentPhase = null;
   lastResponseLength = 0;
+  responseOffset = 0;
   approvedTools = [];
 
   // Hide completion buttons
@@ -3770,6 +3819,7 @@ function startNewTask() {
   currentPlanId = null;
   currentPhase = null;
   lastResponseLength = 0;
+  responseOffset = 0;
   approvedTools = [];
 
   // Clear activity history and storage
@@ -3856,6 +3906,7 @@ async function resetSession() {
     currentPlanId = null;
     currentPhase = null;
     lastResponseLength = 0;
+    responseOffset = 0;
 
     // Clear activity history and storage
     clearActivityStorage();
@@ -4029,6 +4080,7 @@ async function sendPlan() {
   currentPlanId = `plan_${Date.now()}`;
   currentPhase = 'plan';
   lastResponseLength = 0;
+  responseOffset = 0;
 
   // Reset task history tracking for new task
   currentTaskRequest = content;
@@ -4102,6 +4154,7 @@ async function executePlan() {
 
   currentPhase = 'execute';
   lastResponseLength = 0;
+  responseOffset = 0;
 
   elements.actionButtons.classList.add('hidden');
   updatePhaseIndicator('execute');
@@ -4184,6 +4237,7 @@ async function sendRevision() {
   if (!feedback) return;
 
   lastResponseLength = 0;
+  responseOffset = 0;
   currentPhase = 'plan';
 
   const reviseData = {
@@ -4266,6 +4320,7 @@ async function approveAndRerun() {
   elements.blockedCommands.classList.add('hidden');
   blockedCommandsData = {};
   lastResponseLength = 0;
+  responseOffset = 0;
   showLoading('Updating permissions...');
 
   // Update settings.json with newly approved tools
@@ -4497,13 +4552,15 @@ function sendNativeMessage(payload) {
   });
 }
 
-// Native messaging request queue - serialize all calls to prevent response mixup
+// Native messaging request queue. Replies are routed by req_id in the
+// background script, so calls may overlap; the cap matches the host's
+// worker pool so a slow request (e.g. warmup) can't starve the rest
+const MAX_NATIVE_IN_FLIGHT = 4;
 let nativeMessageQueue = [];
-let nativeMessageProcessing = false;
+let nativeMessagesInFlight = 0;
 
 /**
- * Queue a native message call - ensures only ONE call is in-flight at a time
- * This prevents responses from getting mixed up between concurrent calls
+ * Queue a native message call - at most MAX_NATIVE_IN_FLIGHT run at once
  */
 async function queuedSendNativeMessage(payload) {
   return new Promise((resolve, reject) => {
@@ -4513,9 +4570,9 @@ async function queuedSendNativeMessage(payload) {
 }
 
 async function processNativeMessageQueue() {
-  if (nativeMessageProcessing || nativeMessageQueue.length === 0) return;
+  if (nativeMessagesInFlight >= MAX_NATIVE_IN_FLIGHT || nativeMessageQueue.length === 0) return;
 
-  nativeMessageProcessing = true;
+  nativeMessagesInFlight++;
   const { payload, resolve, reject } = nativeMessageQueue.shift();
 
   try {
@@ -4524,11 +4581,8 @@ async function processNativeMessageQueue() {
   } catch (e) {
     reject(e);
   } finally {
-    nativeMessageProcessing = false;
-    // Process next item after a small delay to avoid hammering
-    if (nativeMessageQueue.length > 0) {
-      setTimeout(processNativeMessageQueue, 100);
-    }
+    nativeMessagesInFlight--;
+    processNativeMessageQueue();
   }
 }
 
@@ -131,11 +131,6 @@ function Test-Dependencies {
         $Missing += "ssh"
     }
 
-    # Check SCP
-    if (-not (Get-Command scp -ErrorAction SilentlyContinue)) {
-        $Missing += "scp"
-    }
-
     if ($Missing.Count -gt 0) {
         Write-Error "Missing required dependencies: $($Missing -join ', ')"
         Write-Host ""
@@ -146,7 +141,7 @@ function Test-Dependencies {
         return $false
     }
 
-    Write-Success "All dependencies found (python, ssh, scp)"
+    Write-Success "All dependencies found (python, ssh)"
     return $true
 }
 
@@ -158,16 +158,12 @@ verify_dependencies() {
         missing+=("ssh")
     fi
 
-    if ! command -v scp &> /dev/null; then
-        missing+=("scp")
-    fi
-
     if [ ${#missing[@]} -gt 0 ]; then
         log_error "Missing required dependencies: ${missing[*]}"
         return 1
     fi
 
-    log_success "SSH tools found (ssh, scp)"
+    log_success "SSH found"
 
     # Check SSH config
     if [ -f ~/.ssh/config ]; then
@@ -2,43 +2,195 @@
 """
 PlanDrop Native Messaging Host
 
-Handles communication between Chrome extension and SSH/SCP commands.
+Handles communication between Chrome extension and SSH commands.
 
-V1 actions: send_file, check_file, test_conn
-V2 actions: init_queue, send_plan, poll_responses, read_heartbeat
+V1 actions: send_file, check_file, test_conn, upload, warmup
+V2 actions: init_queue, send_plan, poll_responses, read_heartbeat, poll_state,
+            start_stream, stop_stream
 """
 
+import concurrent.futures
+import io
 import json
 import os
 import re
+import secrets
+import select
 import struct
 import subprocess
 import sys
 import shlex
-import tempfile
+import shutil
+import functools
+import gzip
+import tarfile
+import threading
+import time
 import logging
-from datetime import datetime
+import logging.handlers
+import queue
 from pathlib import Path
 
-# Setup logging
-LOG_DIR = Path.home() / ".plandrop"
-LOG_DIR.mkdir(exist_ok=True)
+# Optional: orjson parses and serializes bytes directly and is much faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# POSIX only; used to enlarge the stdio pipes on Linux
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Setup logging. PLANDROP_LOG_DIR overrides the directory, which also holds
+# the SSH control sockets.
+LOG_DIR = Path(os.environ.get('PLANDROP_LOG_DIR') or Path.home() / ".plandrop")
 LOG_FILE = LOG_DIR / "relay.log"
 
-logging.basicConfig(
-    filename=str(LOG_FILE),
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(message)s",
+
+class _LazyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating handler that creates the log directory on first open."""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+# Size-capped log; set PLANDROP_DEBUG=1 to log every message and command.
+# delay=True: the file (and directory) is only opened on the first record.
+_log_handler = _LazyRotatingFileHandler(
+    str(LOG_FILE), maxBytes=2_000_000, backupCount=3, encoding='utf-8', delay=True
+)
+_log_handler.setFormatter(logging.Formatter(
+    "%(asctime)s [%(levelname)s] %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S"
+))
+logging.getLogger().addHandler(_log_handler)
+logging.getLogger().setLevel(
+    logging.DEBUG if os.environ.get('PLANDROP_DEBUG') else logging.INFO
 )
 
+# Guard for debug logging that needs eager work (slicing, joining argv)
+DEBUG_ON = logging.getLogger().isEnabledFor(logging.DEBUG)
+
 # Timeouts in seconds
 SSH_TIMEOUT = 5  # ConnectTimeout for SSH - first connection can take longer, but ControlMaster reuses it
-SCP_TIMEOUT = 30
+WRITE_TIMEOUT = 30  # Whole ssh session that streams file content over stdin
+
+# Payloads at least this large are gzipped before upload (see _compress_for_upload)
+COMPRESS_MIN_BYTES = 4096
+
+# Resolve binaries once instead of searching PATH on every exec
+SSH_BIN = shutil.which('ssh') or 'ssh'
+
+# SSH connection multiplexing: one long-lived master per (target, key, port).
+# %C is a hash of the connection parameters, keeping the socket path well
+# under the 108-byte sun_path limit. Masters exit after 10 idle minutes.
+# Set PLANDROP_DISABLE_SSH_MUX=1 to turn multiplexing off. It is always off
+# on Windows: Win32-OpenSSH has no ControlMaster support, so every master
+# start would just fail after a connect timeout.
+SSH_MUX = os.name != 'nt' and not os.environ.get('PLANDROP_DISABLE_SSH_MUX')
+CONTROL_PATH = str(LOG_DIR / "cm-%C")
+CONTROL_PERSIST = 600
+
+# Options shared by every ssh invocation
+_COMMON_SSH_OPTIONS = (
+    '-o', 'BatchMode=yes',
+    '-o', 'StrictHostKeyChecking=accept-new',
+    '-o', f'ConnectTimeout={SSH_TIMEOUT}',
+    # Detect dead links so pooled connections fail fast instead of hanging
+    '-o', 'ServerAliveInterval=30',
+    '-o', 'ServerAliveCountMax=3',
+)
+if SSH_MUX:
+    _COMMON_SSH_OPTIONS += (
+        '-o', 'ControlMaster=auto',
+        '-o', f'ControlPath={CONTROL_PATH}',
+        '-o', f'ControlPersist={CONTROL_PERSIST}'
+    )
+
+# Targets with a live ControlMaster, whether started here or found running
+_masters = set()
+# The subset this process started; only these are shut down on exit, since
+# an adopted master (e.g. the user's own ControlMaster or one left by a
+# previous host) may still be serving other ssh sessions
+_started_masters = set()
+_masters_lock = threading.Lock()
+# Per-target locks, so masters for different targets can start in parallel
+_master_locks = {}
+
+# Persistent remote shells, one per (target, key, port); see RemoteShell.
+# Shells unused for SHELL_IDLE_TIMEOUT seconds are closed.
+SHELL_IDLE_TIMEOUT = 600
+_shells = {}
+_shells_lock = threading.Lock()
+# Per-target locks for starting shells, so a slow host doesn't block others
+_shell_locks = {}
+
+# After a master or shell fails to connect, skip them for this many seconds
+# and let callers fall back to a single one-off ssh, instead of paying
+# several connect timeouts on every poll to an unreachable host
+CONNECT_RETRY_DELAY = 30
+_connect_failures = {}
+
+# Response streams started by start_stream: plan_id -> tail Popen.
+# Each holds a session on the ControlMaster, and sshd's MaxSessions (10 by
+# default) caps sessions per connection: MAX_STREAMS plus the workers plus
+# the remote shell must stay below that.
+MAX_STREAMS = 4
+_tail_registry = {}
+_tail_lock = threading.Lock()
+
+# Stream reader threads write to stdout too; frames must not interleave
+_send_lock = threading.Lock()
+
+# run_command streaming: flush partial output at this size or age
+STREAM_BATCH_BYTES = 8192
+STREAM_BATCH_SECONDS = 0.1
+
+# Messages are handled concurrently so one slow SSH call does not hold up
+# the rest; see main(). Also bounds concurrent sessions per ControlMaster.
+MAX_WORKERS = 4
+
+# Native messaging frame header: 4-byte little-endian message length
+_HDR = struct.Struct('<I')
+
+# Kernel buffer size requested for the stdin/stdout pipes (see _grow_pipes).
+# 1 MB is the default /proc/sys/fs/pipe-max-size, so no privileges needed.
+PIPE_SIZE = 1 << 20
+
+# Reused read buffers. Messages up to the payload buffer's size (every
+# poll) are read into it; larger ones get a buffer of their own that is
+# freed after parsing, so a multi-MB send_file doesn't stay allocated
+_HDR_BUF = bytearray(_HDR.size)
+_PAYLOAD_BUF = bytearray(65536)
+
+# JSON codec for native messages: bytes in, bytes out
+if orjson is not None:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+    # catch the stdlib exception with either codec
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        # json.dumps escapes non-ASCII by default, so the output is pure ASCII
+        return json.dumps(obj).encode('ascii')
+
+# Security: Characters that could enable shell injection.
+# Checked with set operations, which skip the regex engine entirely;
+# the target regex is only needed for non-ASCII (Unicode) whitespace.
+DANGEROUS_PATH_CHARS = frozenset(';&|`$()<>\n\r\x00')
+DANGEROUS_TARGET_CHARS = DANGEROUS_PATH_CHARS | frozenset(
+    c for c in map(chr, range(128)) if c.isspace()
+)
+DANGEROUS_TARGET_RE = re.compile(r'[;&|`$()<>\n\r\x00\s]')
 
-# Security: Characters that could enable shell injection
-DANGEROUS_PATH_CHARS = re.compile(r'[;&|`$()<>\n\r\x00]')
-DANGEROUS_TARGET_CHARS = re.compile(r'[;&|`$()<>\n\r\x00\s]')
+# Plan IDs become remote file names. \Z, unlike $, does not accept a
+# trailing newline.
+_PLAN_ID_RE = re.compile(r'\A[A-Za-z0-9_-]+\Z')
 
 
 def validate_path(path):
@@ -48,13 +200,18 @@ def validate_path(path):
     """
     if not path:
         raise ValueError("Path cannot be empty")
+    if not isinstance(path, str):
+        raise ValueError("Path must be a string")
+
+    return _check_path(path)
 
-    if DANGEROUS_PATH_CHARS.search(path):
-        raise ValueError(f"Path contains invalid characters")
 
-    # Also reject paths that look like they're trying to escape quotes
-    if '\\"' in path or "\\'" in path:
-        raise ValueError("Path contains invalid escape sequences")
+# Polling re-validates the same few strings on every message; only valid
+# results are cached, since lru_cache does not cache raised exceptions
+@functools.lru_cache(maxsize=128)
+def _check_path(path):
+    if not DANGEROUS_PATH_CHARS.isdisjoint(path):
+        raise ValueError(f"Path contains invalid characters")
 
     return path
 
@@ -66,50 +223,121 @@ def validate_ssh_target(target):
     """
     if not target:
         raise ValueError("SSH target cannot be empty")
+    if not isinstance(target, str):
+        raise ValueError("SSH target must be a string")
 
-    if DANGEROUS_TARGET_CHARS.search(target):
+    return _check_ssh_target(target)
+
+
+@functools.lru_cache(maxsize=128)
+def _check_ssh_target(target):
+    if not DANGEROUS_TARGET_CHARS.isdisjoint(target) or (
+        not target.isascii() and DANGEROUS_TARGET_RE.search(target)
+    ):
         raise ValueError("SSH target contains invalid characters")
 
     return target
 
 
+def _read_exact(view):
+    """
+    Fill view from stdin, looping over short pipe reads.
+    Reads the raw fd, skipping BufferedReader's lock and extra copy; nothing
+    else reads stdin, so no buffered data can be stranded.
+    Returns the number of bytes read, less than len(view) only at EOF.
+    """
+    raw = sys.stdin.buffer.raw
+    total = 0
+    while total < len(view):
+        n = raw.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+
+def _grow_pipes():
+    """
+    Enlarge the kernel buffers of the stdin/stdout pipes on Linux. The
+    default 64 KB pipe splits a multi-MB file into dozens of reads/writes
+    on both sides; a bigger pipe moves it in a few.
+    """
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return
+
+    set_size = getattr(fcntl, 'F_SETPIPE_SZ', 1031)
+    for fd in (sys.stdin.fileno(), sys.stdout.fileno()):
+        try:
+            fcntl.fcntl(fd, set_size, PIPE_SIZE)
+        except OSError as e:
+            # Not a pipe (e.g. a file in testing), or over pipe-max-size
+            logging.debug("Could not resize pipe on fd %s: %s", fd, e)
+
+
 def read_message():
     """Read a message from stdin using Chrome native messaging protocol."""
     # Read the 4-byte message length
-    raw_length = sys.stdin.buffer.read(4)
-    if len(raw_length) == 0:
+    with memoryview(_HDR_BUF) as view:
+        n = _read_exact(view)
+    if n == 0:
         logging.info("No more input, exiting")
         sys.exit(0)
 
-    if len(raw_length) != 4:
-        logging.error(f"Invalid message length header: {len(raw_length)} bytes")
+    if n != _HDR.size:
+        logging.error("Invalid message length header: %s bytes", n)
         sys.exit(1)
 
     # Unpack the length (little-endian unsigned int)
-    message_length = struct.unpack('<I', raw_length)[0]
-    logging.debug(f"Reading message of {message_length} bytes")
+    message_length = _HDR.unpack_from(_HDR_BUF)[0]
+    logging.debug("Reading message of %s bytes", message_length)
 
-    # Read the message
-    message = sys.stdin.buffer.read(message_length).decode('utf-8')
-    logging.debug(f"Received: {message[:500]}...")
+    if message_length <= len(_PAYLOAD_BUF):
+        buf = _PAYLOAD_BUF
+    else:
+        buf = bytearray(message_length)
+
+    with memoryview(buf)[:message_length] as view:
+        n = _read_exact(view)
+        if n != message_length:
+            logging.error("Truncated message: expected %s bytes, got %s", message_length, n)
+            sys.exit(1)
+
+        if DEBUG_ON:
+            logging.debug("Received: %s...", bytes(view[:500]).decode('utf-8', 'replace'))
 
-    return json.loads(message)
+        # orjson parses the view in place. json.loads doesn't take a
+        # memoryview, so it needs a copy unless the buffer is exactly the
+        # message.
+        if orjson is not None:
+            return orjson.loads(view)
+        return json.loads(buf if len(buf) == message_length else bytes(view))
 
 
 def send_message(message):
     """Send a message to stdout using Chrome native messaging protocol."""
-    encoded = json.dumps(message).encode('utf-8')
-    length = struct.pack('<I', len(encoded))
+    encoded = _json_dumps(message)
+    frame = memoryview(_HDR.pack(len(encoded)) + encoded)
 
-    sys.stdout.buffer.write(length)
-    sys.stdout.buffer.write(encoded)
-    sys.stdout.buffer.flush()
+    # Write the whole frame straight to the fd: no BufferedWriter, no flush.
+    # Large frames can be written partially, so loop until done.
+    fd = sys.stdout.fileno()
+    with _send_lock:
+        while frame:
+            frame = frame[os.write(fd, frame):]
 
-    logging.debug(f"Sent: {message}")
+    # Log only the status: full responses can be large and contain file content
+    logging.debug("Sent: status=%s (%d bytes)", message.get('status'), len(encoded))
 
 
 def build_ssh_args(ssh_target, ssh_key=None, ssh_port=None):
-    """Build SSH/SCP argument list from target configuration."""
+    """Build SSH argument tuple from target configuration."""
+    return _option_args(ssh_key, ssh_port)
+
+
+# The options don't depend on the target, so targets sharing a key and
+# port share one cached tuple
+@functools.lru_cache(maxsize=32)
+def _option_args(ssh_key, ssh_port):
     args = []
 
     # Add key if specified
@@ -122,39 +350,371 @@ def build_ssh_args(ssh_target, ssh_key=None, ssh_port=None):
 
     # Add common options for non-interactive operation
     # ControlMaster enables SSH connection reuse (critical for frequent polling)
-    args.extend([
-        '-o', 'BatchMode=yes',
-        '-o', 'StrictHostKeyChecking=accept-new',
-        '-o', f'ConnectTimeout={SSH_TIMEOUT}',
-        '-o', 'ControlMaster=auto',
-        '-o', 'ControlPath=/tmp/plandrop-%r@%h:%p',
-        '-o', 'ControlPersist=60'
-    ])
+    args.extend(_COMMON_SSH_OPTIONS)
 
-    return args
+    return tuple(args)
 
 
-def build_scp_args(ssh_target, ssh_key=None, ssh_port=None):
-    """Build SCP argument list (uses -P instead of -p for port)."""
-    args = []
+# CPython starts children with posix_spawn (or vfork) instead of fork+exec
+# only when close_fds is off and the executable is an absolute path (SSH_BIN
+# normally is). Leaving fds open is safe: since PEP 446 every fd Python
+# creates is non-inheritable, so the child still only gets its stdio.
+# stdin defaults to /dev/null: ours is Chrome's message pipe, which main()
+# keeps reading while workers run ssh, and ssh forwards its stdin.
+def _run_ssh(args, **kwargs):
+    """subprocess.run on the posix_spawn fast path."""
+    if 'input' not in kwargs:
+        kwargs.setdefault('stdin', subprocess.DEVNULL)
+    return subprocess.run(args, close_fds=False, **kwargs)
 
-    if ssh_key:
-        args.extend(['-i', ssh_key])
 
-    if ssh_port:
-        args.extend(['-P', str(ssh_port)])
+def _spawn_ssh(args, **kwargs):
+    """subprocess.Popen on the posix_spawn fast path."""
+    kwargs.setdefault('stdin', subprocess.DEVNULL)
+    return subprocess.Popen(args, close_fds=False, **kwargs)
 
-    # ControlMaster enables SSH connection reuse (critical for frequent polling)
-    args.extend([
-        '-o', 'BatchMode=yes',
-        '-o', 'StrictHostKeyChecking=accept-new',
-        '-o', f'ConnectTimeout={SSH_TIMEOUT}',
-        '-o', 'ControlMaster=auto',
-        '-o', 'ControlPath=/tmp/plandrop-%r@%h:%p',
-        '-o', 'ControlPersist=60'
-    ])
 
-    return args
+def _recently_failed(key):
+    """True if connecting to key (target, key, port) failed recently."""
+    failed_at = _connect_failures.get(key)
+    return failed_at is not None and time.monotonic() - failed_at < CONNECT_RETRY_DELAY
+
+
+def _ensure_master(ssh_target, ssh_key=None, ssh_port=None):
+    """
+    Start a background ControlMaster for this target if one isn't running.
+    Later ssh calls attach to it instead of doing a full handshake.
+    """
+    if not SSH_MUX:
+        return
+
+    key = (ssh_target, ssh_key, ssh_port)
+    if _recently_failed(key):
+        return
+
+    with _masters_lock:
+        if key in _masters:
+            return
+        lock = _master_locks.setdefault(key, threading.Lock())
+
+    with lock:
+        if key in _masters:
+            return
+
+        common = build_ssh_args(ssh_target, ssh_key, ssh_port)
+
+        try:
+            # A master may survive from a previous host process
+            check = _run_ssh(
+                [SSH_BIN, *common, '-O', 'check', ssh_target],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=SSH_TIMEOUT
+            )
+            if check.returncode != 0:
+                # The control socket lives in LOG_DIR, which is created lazily
+                LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+                # stdio goes to /dev/null: the backgrounded master would
+                # otherwise hold our pipes open for its whole lifetime
+                master = _run_ssh(
+                    [SSH_BIN, *common, '-M', '-N', '-f', ssh_target],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=SSH_TIMEOUT + 5
+                )
+                if master.returncode != 0:
+                    # Not fatal: the caller's own ssh reports the real error
+                    logging.warning("Could not start ControlMaster for %s", ssh_target)
+                    _connect_failures[key] = time.monotonic()
+                    return
+                logging.info("Started ControlMaster for %s", ssh_target)
+                with _masters_lock:
+                    _started_masters.add(key)
+            with _masters_lock:
+                _masters.add(key)
+            _connect_failures.pop(key, None)
+        except subprocess.TimeoutExpired:
+            logging.warning("Timeout starting ControlMaster for %s", ssh_target)
+            _connect_failures[key] = time.monotonic()
+        except FileNotFoundError:
+            pass  # Reported by the caller's own ssh invocation
+
+
+def _close_masters():
+    """
+    Shut down remote shells and the ControlMasters this process started on
+    exit, so sockets are not left for other processes. Masters found already
+    running are left alone. ControlPersist still covers the case where the
+    host is killed before it gets here.
+    """
+    with _shells_lock:
+        shells = list(_shells.values())
+        _shells.clear()
+    for shell in shells:
+        shell.close()
+
+    with _masters_lock:
+        masters = list(_started_masters)
+        _started_masters.clear()
+        _masters.clear()
+    for ssh_target, ssh_key, ssh_port in masters:
+        try:
+            _run_ssh(
+                [SSH_BIN, *build_ssh_args(ssh_target, ssh_key, ssh_port),
+                 '-O', 'exit', ssh_target],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=SSH_TIMEOUT
+            )
+            logging.info("Closed ControlMaster for %s", ssh_target)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logging.warning("Could not close ControlMaster for %s: %s", ssh_target, e)
+
+
+class RemoteShell:
+    """
+    A long-lived `ssh target sh` co-process for short remote commands.
+    Commands are written to its stdin and their output is read back up to a
+    per-command sentinel, so polling doesn't fork+exec ssh on every tick.
+    """
+
+    def __init__(self, ssh_target, ssh_key=None, ssh_port=None):
+        self.ssh_target = ssh_target
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+        args = [SSH_BIN, *build_ssh_args(ssh_target, ssh_key, ssh_port)]
+        args.extend([ssh_target, 'sh'])
+
+        # Unbuffered: stdout is read with os.read() on the raw fd
+        self.proc = _spawn_ssh(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0
+        )
+        logging.info("Opened remote shell on %s", ssh_target)
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def close(self):
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+    def run(self, cmd, timeout=SSH_TIMEOUT + 5):
+        """
+        Run cmd in a subshell on the remote side.
+        Returns (returncode, stdout bytes). Raises OSError if the shell has
+        died and subprocess.TimeoutExpired (after closing it) on timeout.
+        """
+        marker = f"__PLANDROP_DONE_{secrets.token_hex(8)}__".encode('ascii')
+
+        # The subshell keeps `cd` and variables from leaking into later
+        # commands; /dev/null keeps the command off our command stream
+        script = f"( {cmd}\n) </dev/null\nprintf '\\n%s %s\\n' '{marker.decode()}' \"$?\"\n"
+
+        with self.lock:
+            if not self.alive():
+                raise OSError(f"Remote shell on {self.ssh_target} has exited")
+
+            self.last_used = time.monotonic()
+            self.proc.stdin.write(script.encode('utf-8'))
+            self.proc.stdin.flush()
+
+            fd = self.proc.stdout.fileno()
+            buf = bytearray()
+            deadline = time.monotonic() + timeout
+
+            while True:
+                # Sentinel line is "\n<marker> <rc>\n"
+                idx = buf.find(marker)
+                if idx != -1 and buf.find(b'\n', idx) != -1:
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                    # The command may still be running; the shell is unusable
+                    self.close()
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    self.close()
+                    raise OSError(f"Remote shell on {self.ssh_target} has exited")
+                buf += chunk
+
+        end = buf.find(b'\n', idx)
+        returncode = int(buf[idx + len(marker):end])
+        # Drop the newline printed before the marker
+        return returncode, bytes(buf[:idx - 1])
+
+
+def _get_shell(ssh_target, ssh_key=None, ssh_port=None):
+    """
+    Return a live RemoteShell for this target, starting one if needed.
+    Returns None where persistent shells aren't supported (Windows has no
+    select() on pipes), so callers fall back to spawning ssh.
+    """
+    if os.name == 'nt':
+        return None
+
+    key = (ssh_target, ssh_key, ssh_port)
+    with _shells_lock:
+        # Close shells nobody has polled for a while
+        now = time.monotonic()
+        for idle_key, idle in list(_shells.items()):
+            if now - idle.last_used > SHELL_IDLE_TIMEOUT:
+                logging.info("Closing idle remote shell on %s", idle.ssh_target)
+                idle.close()
+                del _shells[idle_key]
+
+        shell = _shells.get(key)
+        if shell is not None and shell.alive():
+            return shell
+        if _recently_failed(key):
+            return None
+        lock = _shell_locks.setdefault(key, threading.Lock())
+
+    # Connecting is network-bound; only hold this target's lock for it
+    with lock:
+        shell = _shells.get(key)
+        if shell is not None and shell.alive():
+            return shell
+
+        _ensure_master(ssh_target, ssh_key, ssh_port)
+        if _recently_failed(key):
+            return None
+
+        shell = RemoteShell(ssh_target, ssh_key, ssh_port)
+        with _shells_lock:
+            _shells[key] = shell
+        return shell
+
+
+def run_remote_batch(ssh_target, ssh_key, ssh_port, commands, timeout=SSH_TIMEOUT + 5):
+    """
+    Run several remote commands in one round-trip.
+    The commands are sent as one script, through the target's RemoteShell
+    when available or else piped to `ssh target sh -s`, and their output is
+    separated by a random sentinel.
+    Returns a list with each command's stdout (bytes), in order.
+    Raises subprocess.CalledProcessError if ssh itself fails.
+    """
+    marker = f"---PLANDROP-{secrets.token_hex(8)}-"
+    sentinel = re.escape(marker.encode('ascii')) + rb'\d+---\n'
+
+    # Commands read from /dev/null so they can't consume the rest of the script
+    script = ''.join(
+        f"printf '%s\\n' '{marker}{i}---'\n{{ {cmd}\n}} </dev/null\n"
+        for i, cmd in enumerate(commands)
+    )
+
+    try:
+        shell = _get_shell(ssh_target, ssh_key, ssh_port)
+        if shell is not None:
+            _, stdout = shell.run(script, timeout)
+            _connect_failures.pop((ssh_target, ssh_key, ssh_port), None)
+            outputs = re.split(sentinel, stdout)[1:]
+            outputs.extend([b''] * (len(commands) - len(outputs)))
+            return outputs
+    except OSError:
+        # Shell couldn't start or died; a one-off ssh reports the real error
+        logging.info("Remote shell on %s unavailable, spawning ssh", ssh_target)
+        _connect_failures[(ssh_target, ssh_key, ssh_port)] = time.monotonic()
+
+    args = [SSH_BIN, *build_ssh_args(ssh_target, ssh_key, ssh_port)]
+    args.extend([ssh_target, 'sh -s'])
+
+    logging.debug("Running batch of %s commands on %s", len(commands), ssh_target)
+
+    result = _run_ssh(
+        args,
+        input=script.encode('utf-8'),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout
+    )
+
+    # 255 is reserved by ssh for connection/authentication failures
+    if result.returncode == 255:
+        raise subprocess.CalledProcessError(
+            result.returncode, args, result.stdout, result.stderr
+        )
+    # The host is reachable again: let the next poll use a shell
+    _connect_failures.pop((ssh_target, ssh_key, ssh_port), None)
+
+    outputs = re.split(sentinel, result.stdout)[1:]
+    outputs.extend([b''] * (len(commands) - len(outputs)))
+    return outputs
+
+
+def run_ssh_with_input(ssh_target, ssh_key, ssh_port, remote_cmd, data, timeout=WRITE_TIMEOUT):
+    """
+    Run remote_cmd over ssh with data (bytes) on its stdin.
+    Used to write files remotely in one session, without temp files or scp.
+    Returns the CompletedProcess, with stdout/stderr as bytes.
+    """
+    args = [SSH_BIN, *build_ssh_args(ssh_target, ssh_key, ssh_port)]
+    args.extend([ssh_target, remote_cmd])
+
+    if DEBUG_ON:
+        logging.debug("Running: %s", ' '.join(args))
+
+    return _run_ssh(
+        args,
+        input=data,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout
+    )
+
+
+def _compress_for_upload(data):
+    """
+    Return (payload, reader) for writing data remotely with `reader > dest`.
+    Large payloads are gzipped here and decompressed with `gzip -dc` on the
+    server. Per-call ssh -C does nothing once a ControlMaster is up, since
+    compression is negotiated when the master connects.
+    """
+    if len(data) < COMPRESS_MIN_BYTES:
+        return data, 'cat'
+    return gzip.compress(data, compresslevel=6, mtime=0), 'gzip -dc'
+
+
+def _bulk_upload(ssh_target, ssh_key, ssh_port, local_paths, remote_dir, then_cmd=None,
+                 timeout=WRITE_TIMEOUT):
+    """
+    Upload several local files into remote_dir in one streamed transfer.
+    The files are packed into a tar stream piped to `tar xf -` on the server,
+    so N files cost one SSH session instead of one scp each. then_cmd, if
+    given, runs remotely after extraction in the same session.
+    Returns the CompletedProcess, with stdout/stderr as bytes.
+    """
+    def _anonymize(info):
+        # Local uid/gid mean nothing on the server (and root would keep them)
+        info.uid = info.gid = 0
+        info.uname = info.gname = ''
+        return info
+
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w') as tar:
+        for path in local_paths:
+            tar.add(str(path), arcname=os.path.basename(path), filter=_anonymize)
+
+    quoted_dir = shlex.quote(remote_dir)
+    remote_cmd = f'mkdir -p {quoted_dir} && tar xf - -C {quoted_dir}'
+    if then_cmd:
+        remote_cmd += f' && {then_cmd}'
+
+    return run_ssh_with_input(
+        ssh_target, ssh_key, ssh_port, remote_cmd, archive.getvalue(), timeout
+    )
 
 
 def action_test_conn(data):
@@ -170,45 +730,45 @@ def action_test_conn(data):
     try:
         ssh_target = validate_ssh_target(ssh_target)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
-    logging.info(f"Testing connection to {ssh_target}")
+    logging.info("Testing connection to %s", ssh_target)
+
+    _ensure_master(ssh_target, ssh_key, ssh_port)
 
     try:
-        args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
-        args.extend([ssh_target, 'echo ok'])
+        args = [SSH_BIN, *build_ssh_args(ssh_target, ssh_key, ssh_port)]
+        # One round-trip: confirm the shell works and fetch the hostname.
+        # The marker lets us skip anything shell startup files print first.
+        args.extend([ssh_target, 'echo __OK__; hostname 2>/dev/null || true'])
 
-        logging.debug(f"Running: {' '.join(args)}")
+        if DEBUG_ON:
+            logging.debug("Running: %s", ' '.join(args))
 
-        result = subprocess.run(
+        result = _run_ssh(
             args,
-            capture_output=True,
-            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             timeout=SSH_TIMEOUT + 5
         )
 
-        if result.returncode == 0:
-            # Try to get hostname for confirmation
-            hostname_result = subprocess.run(
-                ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port) + [ssh_target, 'hostname'],
-                capture_output=True,
-                text=True,
-                timeout=SSH_TIMEOUT + 5
-            )
-            hostname = hostname_result.stdout.strip() if hostname_result.returncode == 0 else ssh_target
+        lines = result.stdout.decode('utf-8', 'replace').splitlines()
+        if result.returncode == 0 and '__OK__' in lines:
+            after = lines[lines.index('__OK__') + 1:]
+            hostname = after[0].strip() if after and after[0].strip() else ssh_target
 
             return {
                 "status": "success",
                 "message": f"Connected to {ssh_target} ({hostname})"
             }
         else:
-            error = result.stderr.strip() or "Connection failed"
-            logging.error(f"SSH test failed: {error}")
+            error = result.stderr.decode('utf-8', 'replace').strip() or "Connection failed"
+            logging.error("SSH test failed: %s", error)
             return {"status": "error", "message": error}
 
     except subprocess.TimeoutExpired:
-        logging.error(f"SSH timeout connecting to {ssh_target}")
+        logging.error("SSH timeout connecting to %s", ssh_target)
         return {"status": "error", "message": "Connection timed out"}
     except FileNotFoundError:
         logging.error("SSH command not found")
@@ -218,66 +778,88 @@ def action_test_conn(data):
         return {"status": "error", "message": str(e)}
 
 
+def _stat_command(remote_path):
+    """
+    Build a remote command printing "<size> <mtime>" for a file, or nothing.
+    Tries GNU stat first (Linux), falls back to BSD stat (macOS).
+    """
+    # GNU: stat -c "%s %Y" = size, mtime (epoch)
+    # BSD: stat -f "%z %m" = size, mtime (epoch)
+    quoted = shlex.quote(remote_path)
+    return (
+        f'stat -c "%s %Y" {quoted} 2>/dev/null || '
+        f'stat -f "%z %m" {quoted} 2>/dev/null'
+    )
+
+
+def _parse_stat(output):
+    """Turn the output of _stat_command into check_file result fields."""
+    # Only the first two fields are needed; split() skips leading whitespace
+    parts = output.split(None, 2)
+    if len(parts) >= 2:
+        size = int(parts[0])
+        mtime = int(parts[1])
+        # Formatted in the host's local time, as before; time.strftime skips
+        # building a datetime object
+        modified = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))
+
+        return {"exists": True, "size": size, "modified": modified}
+
+    # File doesn't exist
+    return {"exists": False}
+
+
 def action_check_file(data):
-    """Check if a file exists on the remote server."""
+    """
+    Check if a file exists on the remote server.
+    Accepts remote_paths (a list) instead of remote_path to check several
+    files in one SSH call; results are then returned as "files".
+    """
     ssh_target = data.get('ssh_target')
     remote_path = data.get('remote_path')
+    remote_paths = data.get('remote_paths')
     ssh_key = data.get('ssh_key')
     ssh_port = data.get('ssh_port')
 
-    if not ssh_target or not remote_path:
+    if not ssh_target or not (remote_path or remote_paths):
         return {"status": "error", "message": "Missing ssh_target or remote_path"}
 
+    if remote_paths is not None and not isinstance(remote_paths, list):
+        return {"status": "error", "message": "remote_paths must be a list"}
+
     # Security: Validate inputs to prevent command injection
     try:
         ssh_target = validate_ssh_target(ssh_target)
-        remote_path = validate_path(remote_path)
-    except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        paths = [validate_path(p) for p in (remote_paths or [remote_path])]
+    except (ValueError, TypeError) as e:
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
-    logging.info(f"Checking file {remote_path} on {ssh_target}")
-
-    try:
-        # Use stat to get file info
-        # Try GNU stat first (Linux), fall back to BSD stat (macOS)
-        # GNU: stat -c "%s %Y" = size, mtime (epoch)
-        # BSD: stat -f "%z %m" = size, mtime (epoch)
-        stat_cmd = (
-            f'stat -c "%s %Y" "{remote_path}" 2>/dev/null || '
-            f'stat -f "%z %m" "{remote_path}" 2>/dev/null'
-        )
-        args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
-        args.extend([ssh_target, stat_cmd])
+    logging.info("Checking %d file(s) on %s: %s", len(paths), ssh_target, paths[0])
 
-        logging.debug(f"Running: {' '.join(args)}")
+    _ensure_master(ssh_target, ssh_key, ssh_port)
 
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=SSH_TIMEOUT + 5
+    try:
+        # All stats go over a single SSH invocation
+        outputs = run_remote_batch(
+            ssh_target, ssh_key, ssh_port, [_stat_command(p) for p in paths]
         )
+        results = [_parse_stat(output) for output in outputs]
 
-        if result.returncode == 0 and result.stdout.strip():
-            parts = result.stdout.strip().split()
-            if len(parts) >= 2:
-                size = int(parts[0])
-                mtime = int(parts[1])
-                modified = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
-
-                return {
-                    "status": "success",
-                    "exists": True,
-                    "size": size,
-                    "modified": modified
-                }
+        if remote_paths is not None:
+            return {
+                "status": "success",
+                "files": [dict(path=p, **r) for p, r in zip(paths, results)]
+            }
 
-        # File doesn't exist
-        return {"status": "success", "exists": False}
+        return {"status": "success", **results[0]}
 
+    except subprocess.CalledProcessError as e:
+        error = e.stderr.decode('utf-8', 'replace').strip() or "Connection failed"
+        logging.error("SSH check failed: %s", error)
+        return {"status": "error", "message": error}
     except subprocess.TimeoutExpired:
-        logging.error(f"SSH timeout checking file on {ssh_target}")
+        logging.error("SSH timeout checking file on %s", ssh_target)
         return {"status": "error", "message": "Connection timed out"}
     except Exception as e:
         logging.exception("Unexpected error in check_file")
@@ -285,7 +867,7 @@ def action_check_file(data):
 
 
 def action_send_file(data):
-    """Send a file to the remote server via SCP."""
+    """Send a file to the remote server over a single SSH session."""
     ssh_target = data.get('ssh_target')
     remote_path = data.get('remote_path')
     content = data.get('content')
@@ -301,83 +883,165 @@ def action_send_file(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
-    logging.info(f"Sending file to {ssh_target}:{remote_path} (overwrite={overwrite})")
+    logging.info("Sending file to %s:%s (overwrite=%s)", ssh_target, remote_path, overwrite)
 
-    # Create temp file with content
-    temp_fd = None
-    temp_path = None
+    _ensure_master(ssh_target, ssh_key, ssh_port)
 
     try:
-        # Write content to temp file
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.md', prefix='plandrop_')
-        with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
-            f.write(content)
-        temp_fd = None  # File descriptor is now closed
-
-        logging.debug(f"Wrote {len(content)} bytes to {temp_path}")
-
-        # Ensure remote directory exists
+        # Create the remote directory and write the file in one SSH session,
+        # streaming content over stdin instead of staging it in a temp file
         remote_dir = os.path.dirname(remote_path)
+        write_cmd = f'cat > {shlex.quote(remote_path)}'
         if remote_dir:
-            mkdir_args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
-            mkdir_args.extend([ssh_target, f'mkdir -p "{remote_dir}"'])
-
-            mkdir_result = subprocess.run(
-                mkdir_args,
-                capture_output=True,
-                text=True,
-                timeout=SSH_TIMEOUT + 5
-            )
-
-            if mkdir_result.returncode != 0:
-                error = mkdir_result.stderr.strip() or "Failed to create directory"
-                logging.error(f"mkdir failed: {error}")
-                return {"status": "error", "message": f"Cannot create directory: {error}"}
-
-        # SCP the file
-        scp_args = ['scp'] + build_scp_args(ssh_target, ssh_key, ssh_port)
-        scp_args.extend([temp_path, f'{ssh_target}:{remote_path}'])
-
-        logging.debug(f"Running: {' '.join(scp_args)}")
+            remote_cmd = f'mkdir -p {shlex.quote(remote_dir)} && {write_cmd}'
+        else:
+            remote_cmd = write_cmd
 
-        result = subprocess.run(
-            scp_args,
-            capture_output=True,
-            text=True,
-            timeout=SCP_TIMEOUT
+        result = run_ssh_with_input(
+            ssh_target, ssh_key, ssh_port, remote_cmd, content.encode('utf-8')
         )
 
         if result.returncode == 0:
-            logging.info(f"Successfully sent to {ssh_target}:{remote_path}")
+            logging.info("Successfully sent to %s:%s", ssh_target, remote_path)
             return {
                 "status": "success",
                 "message": f"Sent to {ssh_target}:{remote_path}"
             }
         else:
-            error = result.stderr.strip() or "SCP failed"
-            logging.error(f"SCP failed: {error}")
+            error = result.stderr.decode('utf-8', 'replace').strip() or "Transfer failed"
+            logging.error("Send failed: %s", error)
             return {"status": "error", "message": error}
 
     except subprocess.TimeoutExpired:
-        logging.error(f"SCP timeout sending to {ssh_target}")
+        logging.error("SSH timeout sending to %s", ssh_target)
         return {"status": "error", "message": "Transfer timed out"}
     except FileNotFoundError:
-        logging.error("SCP command not found")
-        return {"status": "error", "message": "SCP command not found on system"}
+        logging.error("SSH command not found")
+        return {"status": "error", "message": "SSH command not found on system"}
     except Exception as e:
         logging.exception("Unexpected error in send_file")
         return {"status": "error", "message": str(e)}
-    finally:
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-                logging.debug(f"Cleaned up temp file {temp_path}")
-            except Exception as e:
-                logging.warning(f"Failed to clean up temp file: {e}")
+
+
+def action_upload(data):
+    """
+    Check and send a file in one SSH session.
+    Stats the remote file first; if it exists and overwrite is not set,
+    nothing is written and its size/mtime are returned with status "exists".
+    Otherwise the file is written and the previous stat is returned.
+    """
+    ssh_target = data.get('ssh_target')
+    remote_path = data.get('remote_path')
+    content = data.get('content')
+    ssh_key = data.get('ssh_key')
+    ssh_port = data.get('ssh_port')
+    overwrite = bool(data.get('overwrite', False))
+
+    if not ssh_target or not remote_path or content is None:
+        return {"status": "error", "message": "Missing ssh_target, remote_path, or content"}
+
+    # Security: Validate inputs to prevent command injection
+    try:
+        ssh_target = validate_ssh_target(ssh_target)
+        remote_path = validate_path(remote_path)
+    except ValueError as e:
+        logging.warning("Input validation failed: %s", e)
+        return {"status": "error", "message": str(e)}
+
+    logging.info("Uploading to %s:%s (overwrite=%s)", ssh_target, remote_path, overwrite)
+
+    _ensure_master(ssh_target, ssh_key, ssh_port)
+
+    try:
+        # Print the current stat line (empty if missing), then write unless
+        # the file exists and overwrite is off. The marker separates it from
+        # anything the remote shell's startup files print.
+        remote_dir = os.path.dirname(remote_path)
+        write_cmd = f'cat > {shlex.quote(remote_path)}'
+        if remote_dir:
+            write_cmd = f'mkdir -p {shlex.quote(remote_dir)} && {write_cmd}'
+        remote_cmd = (
+            f'old=$({_stat_command(remote_path)}); '
+            f"printf '__STAT__\\n%s\\n' \"$old\"; "
+            f'if [ -n "$old" ] && [ {int(overwrite)} = 0 ]; then exit 0; fi; '
+            f'{write_cmd}'
+        )
+
+        result = run_ssh_with_input(
+            ssh_target, ssh_key, ssh_port, remote_cmd, content.encode('utf-8')
+        )
+
+        if result.returncode != 0:
+            error = result.stderr.decode('utf-8', 'replace').strip() or "Transfer failed"
+            logging.error("Upload failed: %s", error)
+            return {"status": "error", "message": error}
+
+        _, marker, after = result.stdout.partition(b'__STAT__\n')
+        if not marker:
+            logging.error("Upload got unexpected output: %r", result.stdout[:200])
+            return {"status": "error", "message": "Unexpected response from remote"}
+        previous = _parse_stat(after.partition(b'\n')[0])
+        if previous["exists"] and not overwrite:
+            logging.info("Not overwriting existing %s:%s", ssh_target, remote_path)
+            return {"status": "exists", **previous}
+
+        logging.info("Successfully uploaded to %s:%s", ssh_target, remote_path)
+        return {
+            "status": "success",
+            "message": f"Sent to {ssh_target}:{remote_path}",
+            "previous": previous
+        }
+
+    except subprocess.TimeoutExpired:
+        logging.error("SSH timeout uploading to %s", ssh_target)
+        return {"status": "error", "message": "Transfer timed out"}
+    except FileNotFoundError:
+        logging.error("SSH command not found")
+        return {"status": "error", "message": "SSH command not found on system"}
+    except Exception as e:
+        logging.exception("Unexpected error in upload")
+        return {"status": "error", "message": str(e)}
+
+
+def action_warmup(data):
+    """
+    Open ControlMasters for a list of targets in parallel, so the first real
+    request to each one attaches to a warm connection.
+    targets: [{"ssh_target", "ssh_key", "ssh_port"}, ...]
+    """
+    targets = data.get('targets')
+
+    if not isinstance(targets, list) or not targets:
+        return {"status": "error", "message": "targets must be a non-empty list"}
+
+    # Security: Validate inputs
+    try:
+        keys = []
+        for target in targets:
+            if not isinstance(target, dict):
+                raise ValueError("Each target must be an object")
+            key = (validate_ssh_target(target.get('ssh_target')),
+                   target.get('ssh_key'), target.get('ssh_port'))
+            if key not in keys:
+                keys.append(key)
+    except ValueError as e:
+        logging.warning("Input validation failed: %s", e)
+        return {"status": "error", "message": str(e)}
+
+    if not SSH_MUX:
+        return {"status": "success", "warmed": []}
+
+    logging.info("Warming up %d target(s)", len(keys))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(keys), 8)) as pool:
+        list(pool.map(lambda key: _ensure_master(*key), keys))
+
+    with _masters_lock:
+        warmed = [key[0] for key in keys if key in _masters]
+    return {"status": "success", "warmed": warmed}
 
 
 # ============================================
@@ -402,85 +1066,50 @@ def action_init_queue(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
-    logging.info(f"Initializing queue at {ssh_target}:{remote_path}/.plandrop")
+    logging.info("Initializing queue at %s:%s/.plandrop", ssh_target, remote_path)
+
+    # Warm the master now so the rest of the V2 session attaches to it
+    _ensure_master(ssh_target, ssh_key, ssh_port)
 
     plandrop_dir = f"{remote_path}/.plandrop"
 
     try:
-        # Create directory structure
+        watch_script = Path(__file__).parent / 'watch.sh'
+        if not watch_script.exists():
+            return {"status": "error", "message": "watch.sh not found in native-host directory"}
+
+        # Upload watch.sh, create the queue directories and make the script
+        # executable, all in one SSH session
         dirs = [
             f"{plandrop_dir}/plans",
             f"{plandrop_dir}/responses",
             f"{plandrop_dir}/completed"
         ]
-        mkdir_cmd = f'mkdir -p {" ".join(dirs)}'
-
-        args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
-        args.extend([ssh_target, mkdir_cmd])
-
-        logging.debug(f"Running: {' '.join(args)}")
-
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=SSH_TIMEOUT + 5
-        )
-
-        if result.returncode != 0:
-            error = result.stderr.strip() or "Failed to create directories"
-            logging.error(f"mkdir failed: {error}")
-            return {"status": "error", "message": error}
-
-        # Copy watch.sh to server
-        watch_script = Path(__file__).parent / 'watch.sh'
-        if not watch_script.exists():
-            return {"status": "error", "message": "watch.sh not found in native-host directory"}
-
-        scp_args = ['scp'] + build_scp_args(ssh_target, ssh_key, ssh_port)
-        scp_args.extend([str(watch_script), f'{ssh_target}:{plandrop_dir}/watch.sh'])
-
-        logging.debug(f"Running: {' '.join(scp_args)}")
-
-        result = subprocess.run(
-            scp_args,
-            capture_output=True,
-            text=True,
-            timeout=SCP_TIMEOUT
+        setup_cmd = (
+            f'mkdir -p {" ".join(shlex.quote(d) for d in dirs)} && '
+            f'chmod +x {shlex.quote(f"{plandrop_dir}/watch.sh")}'
         )
 
-        if result.returncode != 0:
-            error = result.stderr.strip() or "Failed to copy watch.sh"
-            logging.error(f"SCP failed: {error}")
-            return {"status": "error", "message": error}
-
-        # Make watch.sh executable
-        chmod_args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
-        chmod_args.extend([ssh_target, f'chmod +x "{plandrop_dir}/watch.sh"'])
-
-        result = subprocess.run(
-            chmod_args,
-            capture_output=True,
-            text=True,
-            timeout=SSH_TIMEOUT + 5
+        result = _bulk_upload(
+            ssh_target, ssh_key, ssh_port, [watch_script], plandrop_dir, setup_cmd
         )
 
         if result.returncode != 0:
-            error = result.stderr.strip() or "Failed to make watch.sh executable"
-            logging.error(f"chmod failed: {error}")
+            error = result.stderr.decode('utf-8', 'replace').strip() or "Failed to set up queue"
+            logging.error("Queue setup failed: %s", error)
             return {"status": "error", "message": error}
 
-        logging.info(f"Queue initialized at {ssh_target}:{plandrop_dir}")
+        logging.info("Queue initialized at %s:%s", ssh_target, plandrop_dir)
         return {
             "status": "success",
             "message": f"Queue initialized at {plandrop_dir}"
         }
 
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout initializing queue on {ssh_target}")
+        logging.error("Timeout initializing queue on %s", ssh_target)
         return {"status": "error", "message": "Connection timed out"}
     except Exception as e:
         logging.exception("Unexpected error in init_queue")
@@ -489,7 +1118,7 @@ def action_init_queue(data):
 
 def action_send_plan(data):
     """
-    Send a plan JSON to .plandrop/plans/ via SCP.
+    Send a plan JSON to .plandrop/plans/ over SSH.
     The plan will be picked up by watch.sh and processed.
     """
     ssh_target = data.get('ssh_target')
@@ -506,74 +1135,65 @@ def action_send_plan(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
     # Parse plan to get ID
     try:
-        plan = json.loads(plan_data)
-        plan_id = plan.get('id')
+        plan = _json_loads(plan_data)
+        plan_id = plan.get('id') if isinstance(plan, dict) else None
         if not plan_id:
             return {"status": "error", "message": "Plan data missing 'id' field"}
         # Security: Validate plan_id to prevent path traversal
-        if not re.match(r'^[a-zA-Z0-9_-]+$', plan_id):
+        if not isinstance(plan_id, str) or not _PLAN_ID_RE.match(plan_id):
             return {"status": "error", "message": "Invalid plan_id format"}
     except json.JSONDecodeError as e:
         return {"status": "error", "message": f"Invalid plan JSON: {e}"}
 
-    logging.info(f"Sending plan {plan_id} to {ssh_target}:{remote_path}/.plandrop/plans/")
+    logging.info("Sending plan %s to %s:%s/.plandrop/plans/", plan_id, ssh_target, remote_path)
 
-    temp_path = None
     try:
-        # Write plan to temp file
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.json', prefix='plandrop_plan_')
-        with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
-            f.write(plan_data)
-
-        # SCP to plans/ directory
+        # Stream the plan over ssh stdin. It is written under a .tmp name and
+        # renamed so watch.sh (which globs *.json) never sees a partial file.
         dest = f"{remote_path}/.plandrop/plans/{plan_id}.json"
-        scp_args = ['scp'] + build_scp_args(ssh_target, ssh_key, ssh_port)
-        scp_args.extend([temp_path, f'{ssh_target}:{dest}'])
+        quoted = shlex.quote(dest)
+        quoted_tmp = shlex.quote(dest + '.tmp')
+        payload, reader = _compress_for_upload(plan_data.encode('utf-8'))
+        remote_cmd = f'{reader} > {quoted_tmp} && mv -f {quoted_tmp} {quoted}'
 
-        logging.debug(f"Running: {' '.join(scp_args)}")
-
-        result = subprocess.run(
-            scp_args,
-            capture_output=True,
-            text=True,
-            timeout=SCP_TIMEOUT
+        result = run_ssh_with_input(
+            ssh_target, ssh_key, ssh_port, remote_cmd, payload
         )
 
         if result.returncode == 0:
-            logging.info(f"Plan {plan_id} sent successfully")
+            logging.info("Plan %s sent successfully", plan_id)
             return {"status": "success", "id": plan_id}
         else:
-            error = result.stderr.strip() or "SCP failed"
-            logging.error(f"SCP failed: {error}")
+            error = result.stderr.decode('utf-8', 'replace').strip() or "Transfer failed"
+            logging.error("Sending plan failed: %s", error)
             return {"status": "error", "message": error}
 
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout sending plan to {ssh_target}")
+        logging.error("Timeout sending plan to %s", ssh_target)
         return {"status": "error", "message": "Transfer timed out"}
     except Exception as e:
         logging.exception("Unexpected error in send_plan")
         return {"status": "error", "message": str(e)}
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except Exception:
-                pass
 
 
 def action_poll_responses(data):
     """
     Read Claude Code response JSONL file for a specific plan.
     Returns the file content if it exists, empty otherwise.
+
+    If the client passes a byte `offset`, only complete lines after it are
+    returned, along with the offset to send next time, so each poll
+    transfers only what is new.
     """
     ssh_target = data.get('ssh_target')
     remote_path = data.get('remote_path')
     plan_id = data.get('plan_id')
+    offset = data.get('offset')
     ssh_key = data.get('ssh_key')
     ssh_port = data.get('ssh_port')
 
@@ -585,34 +1205,50 @@ def action_poll_responses(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
         # plan_id should be alphanumeric with underscores
-        if not re.match(r'^[a-zA-Z0-9_-]+$', plan_id):
+        if not _PLAN_ID_RE.match(plan_id):
             raise ValueError("Invalid plan_id format")
+        # bool is an int subclass; reject it explicitly
+        if offset is not None and (type(offset) is not int or offset < 0):
+            raise ValueError("Invalid offset")
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
     response_file = f"{remote_path}/.plandrop/responses/{plan_id}.jsonl"
-    logging.debug(f"Polling response: {ssh_target}:{response_file}")
+    logging.debug("Polling response: %s:%s (offset %s)", ssh_target, response_file, offset)
 
-    try:
-        # Read the response file via SSH
-        args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
-        args.extend([ssh_target, f'cat "{response_file}" 2>/dev/null'])
+    if offset is None:
+        read_cmd = f'cat {shlex.quote(response_file)} 2>/dev/null'
+    else:
+        read_cmd = f'tail -c +{offset + 1} {shlex.quote(response_file)} 2>/dev/null'
 
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=SSH_TIMEOUT + 5
-        )
+    try:
+        # Read the response file via the target's persistent shell
+        output = run_remote_batch(ssh_target, ssh_key, ssh_port, [read_cmd])[0]
+
+        if offset is not None:
+            # Hold back a partially written last line (and any split UTF-8
+            # sequence in it) until the next poll
+            complete = output[:output.rfind(b'\n') + 1]
+            if not complete.strip():
+                return {"status": "empty", "offset": offset}
+            return {
+                "status": "ok",
+                "content": complete.decode('utf-8', 'replace'),
+                "offset": offset + len(complete)
+            }
 
-        if result.stdout.strip():
-            return {"status": "ok", "content": result.stdout}
+        if output.strip():
+            return {"status": "ok", "content": output.decode('utf-8', 'replace')}
         else:
             return {"status": "empty"}
 
+    except subprocess.CalledProcessError as e:
+        error = e.stderr.decode('utf-8', 'replace').strip() or "Connection failed"
+        logging.error("Polling responses failed: %s", error)
+        return {"status": "error", "message": error}
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout polling responses from {ssh_target}")
+        logging.error("Timeout polling responses from %s", ssh_target)
         return {"status": "error", "message": "Connection timed out"}
     except Exception as e:
         logging.exception("Unexpected error in poll_responses")
@@ -637,37 +1273,96 @@ def action_read_heartbeat(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
     heartbeat_file = f"{remote_path}/.plandrop/heartbeat"
-    logging.debug(f"Reading heartbeat: {ssh_target}:{heartbeat_file}")
+    logging.debug("Reading heartbeat: %s:%s", ssh_target, heartbeat_file)
 
     try:
-        args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
-        args.extend([ssh_target, f'cat "{heartbeat_file}" 2>/dev/null'])
-
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=SSH_TIMEOUT + 5
-        )
+        output = run_remote_batch(
+            ssh_target, ssh_key, ssh_port, [f'cat {shlex.quote(heartbeat_file)} 2>/dev/null']
+        )[0]
 
-        timestamp = result.stdout.strip()
+        timestamp = output.decode('utf-8', 'replace').strip()
         if timestamp:
             return {"status": "ok", "timestamp": timestamp}
         else:
             return {"status": "not_running"}
 
+    except subprocess.CalledProcessError as e:
+        error = e.stderr.decode('utf-8', 'replace').strip() or "Connection failed"
+        logging.error("Reading heartbeat failed: %s", error)
+        return {"status": "error", "message": error}
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout reading heartbeat from {ssh_target}")
+        logging.error("Timeout reading heartbeat from %s", ssh_target)
         return {"status": "error", "message": "Connection timed out"}
     except Exception as e:
         logging.exception("Unexpected error in read_heartbeat")
         return {"status": "error", "message": str(e)}
 
 
+def action_poll_state(data):
+    """
+    Read heartbeat, session_id and (if plan_id is given) the plan's response
+    JSONL in one remote round-trip, instead of three separate polls.
+    Missing files are returned as null.
+    """
+    ssh_target = data.get('ssh_target')
+    remote_path = data.get('remote_path')
+    plan_id = data.get('plan_id')
+    ssh_key = data.get('ssh_key')
+    ssh_port = data.get('ssh_port')
+
+    if not ssh_target or not remote_path:
+        return {"status": "error", "message": "Missing ssh_target or remote_path"}
+
+    # Security: Validate inputs
+    try:
+        ssh_target = validate_ssh_target(ssh_target)
+        remote_path = validate_path(remote_path)
+        if plan_id and not _PLAN_ID_RE.match(plan_id):
+            raise ValueError("Invalid plan_id format")
+    except ValueError as e:
+        logging.warning("Input validation failed: %s", e)
+        return {"status": "error", "message": str(e)}
+
+    plandrop_dir = f"{remote_path}/.plandrop"
+    files = [f"{plandrop_dir}/heartbeat", f"{plandrop_dir}/session_id"]
+    if plan_id:
+        files.append(f"{plandrop_dir}/responses/{plan_id}.jsonl")
+
+    logging.debug("Polling state: %s:%s", ssh_target, plandrop_dir)
+
+    try:
+        outputs = run_remote_batch(
+            ssh_target, ssh_key, ssh_port, [f'cat {shlex.quote(f)} 2>/dev/null' for f in files]
+        )
+        texts = [output.decode('utf-8', 'replace') for output in outputs]
+
+        heartbeat = texts[0].strip()
+        session_id = texts[1].strip()
+        response = texts[2] if plan_id and texts[2].strip() else None
+
+        return {
+            "status": "ok",
+            "heartbeat": heartbeat or None,
+            "session_id": session_id or None,
+            "response": response
+        }
+
+    except subprocess.CalledProcessError as e:
+        error = e.stderr.decode('utf-8', 'replace').strip() or "Connection failed"
+        logging.error("Polling state failed: %s", error)
+        return {"status": "error", "message": error}
+    except subprocess.TimeoutExpired:
+        logging.error("Timeout polling state from %s", ssh_target)
+        return {"status": "error", "message": "Connection timed out"}
+    except Exception as e:
+        logging.exception("Unexpected error in poll_state")
+        return {"status": "error", "message": str(e)}
+
+
 def action_write_settings(data):
     """
     Write .claude/settings.json to server.
@@ -687,75 +1382,47 @@ def action_write_settings(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
     # Validate that settings_json is valid JSON
     try:
-        json.loads(settings_json)
+        _json_loads(settings_json)
     except json.JSONDecodeError as e:
         return {"status": "error", "message": f"Invalid settings JSON: {e}"}
 
-    logging.info(f"Writing settings.json to {ssh_target}:{remote_path}/.claude/")
+    logging.info("Writing settings.json to %s:%s/.claude/", ssh_target, remote_path)
 
-    temp_path = None
     try:
-        # Ensure .claude/ directory exists
-        claude_dir = f"{remote_path}/.claude"
-        mkdir_args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
-        mkdir_args.extend([ssh_target, f'mkdir -p "{claude_dir}"'])
-
-        result = subprocess.run(
-            mkdir_args,
-            capture_output=True,
-            text=True,
-            timeout=SSH_TIMEOUT + 5
-        )
-
-        if result.returncode != 0:
-            error = result.stderr.strip() or "Failed to create .claude directory"
-            logging.error(f"mkdir failed: {error}")
-            return {"status": "error", "message": error}
-
-        # Write settings to temp file
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.json', prefix='plandrop_settings_')
-        with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
-            f.write(settings_json)
-
-        # SCP to .claude/settings.json
-        dest = f"{claude_dir}/settings.json"
-        scp_args = ['scp'] + build_scp_args(ssh_target, ssh_key, ssh_port)
-        scp_args.extend([temp_path, f'{ssh_target}:{dest}'])
-
-        logging.debug(f"Running: {' '.join(scp_args)}")
-
-        result = subprocess.run(
-            scp_args,
-            capture_output=True,
-            text=True,
-            timeout=SCP_TIMEOUT
+        # Create .claude/ and stream settings.json over ssh stdin in one
+        # session; written under a .tmp name and renamed into place
+        dest = f"{remote_path}/.claude/settings.json"
+        quoted = shlex.quote(dest)
+        quoted_tmp = shlex.quote(dest + '.tmp')
+        quoted_dir = shlex.quote(f"{remote_path}/.claude")
+        payload, reader = _compress_for_upload(settings_json.encode('utf-8'))
+        remote_cmd = (f'mkdir -p {quoted_dir} && {reader} > {quoted_tmp} && '
+                      f'mv -f {quoted_tmp} {quoted}')
+
+        _ensure_master(ssh_target, ssh_key, ssh_port)
+        result = run_ssh_with_input(
+            ssh_target, ssh_key, ssh_port, remote_cmd, payload
         )
 
         if result.returncode == 0:
-            logging.info(f"Settings written to {ssh_target}:{dest}")
+            logging.info("Settings written to %s:%s", ssh_target, dest)
             return {"status": "success", "message": "Settings written"}
         else:
-            error = result.stderr.strip() or "SCP failed"
-            logging.error(f"SCP failed: {error}")
+            error = result.stderr.decode('utf-8', 'replace').strip() or "Transfer failed"
+            logging.error("Writing settings failed: %s", error)
             return {"status": "error", "message": error}
 
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout writing settings to {ssh_target}")
+        logging.error("Timeout writing settings to %s", ssh_target)
         return {"status": "error", "message": "Connection timed out"}
     except Exception as e:
         logging.exception("Unexpected error in write_settings")
         return {"status": "error", "message": str(e)}
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except Exception:
-                pass
 
 
 def action_read_session(data):
@@ -776,31 +1443,29 @@ def action_read_session(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
     session_file = f"{remote_path}/.plandrop/session_id"
-    logging.debug(f"Reading session: {ssh_target}:{session_file}")
+    logging.debug("Reading session: %s:%s", ssh_target, session_file)
 
     try:
-        args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
-        args.extend([ssh_target, f'cat "{session_file}" 2>/dev/null'])
-
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=SSH_TIMEOUT + 5
-        )
+        output = run_remote_batch(
+            ssh_target, ssh_key, ssh_port, [f'cat {shlex.quote(session_file)} 2>/dev/null']
+        )[0]
 
-        session_id = result.stdout.strip()
+        session_id = output.decode('utf-8', 'replace').strip()
         if session_id:
             return {"status": "ok", "session_id": session_id}
         else:
             return {"status": "empty"}
 
+    except subprocess.CalledProcessError as e:
+        error = e.stderr.decode('utf-8', 'replace').strip() or "Connection failed"
+        logging.error("Reading session failed: %s", error)
+        return {"status": "error", "message": error}
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout reading session from {ssh_target}")
+        logging.error("Timeout reading session from %s", ssh_target)
         return {"status": "error", "message": "Connection timed out"}
     except Exception as e:
         logging.exception("Unexpected error in read_session")
@@ -810,7 +1475,9 @@ def action_read_session(data):
 def action_reset_session(data):
     """
     Archive the current session to history and delete session_id.
-    Appends session info to session_history.jsonl before deleting.
+    Appends session info to session_history.jsonl before deleting. This is
+    done by `plandrop-history --archive-session` on the server when it is
+    installed, with an inline shell append as fallback.
     """
     ssh_target = data.get('ssh_target')
     remote_path = data.get('remote_path')
@@ -827,53 +1494,57 @@ def action_reset_session(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
     plandrop_dir = f"{remote_path}/.plandrop"
     session_file = f"{plandrop_dir}/session_id"
     history_file = f"{plandrop_dir}/session_history.jsonl"
 
-    logging.info(f"Resetting session on {ssh_target}:{remote_path}")
+    logging.info("Resetting session on %s:%s", ssh_target, remote_path)
 
     try:
-        # Build the command to archive and delete
-        # If session_id provided, append to history first
-        if session_id:
-            entry = json.dumps({"session_id": session_id, "ended": timestamp or ""})
-            # Escape for shell
-            entry_escaped = entry.replace("'", "'\\''")
-            archive_cmd = f"echo '{entry_escaped}' >> \"{history_file}\" && "
-        else:
-            archive_cmd = ""
-
         # Delete session_id file
-        delete_cmd = f"rm -f \"{session_file}\""
+        full_cmd = f"rm -f {shlex.quote(session_file)}"
 
-        full_cmd = archive_cmd + delete_cmd
+        # If session_id provided, archive it first. plandrop-history does the
+        # locked, fsynced append and the delete; older servers without it
+        # (or with a version lacking --archive-session) get the plain append.
+        if session_id:
+            entry = json.dumps({"session_id": session_id, "ended": timestamp or ""})
+            fallback = (f"printf '%s\\n' {shlex.quote(entry)} >> {shlex.quote(history_file)} "
+                        f"&& {full_cmd}")
+            full_cmd = (
+                f'cd {shlex.quote(remote_path)} && '
+                f'{{ PATH="$PATH:$HOME/.local/bin" plandrop-history '
+                f'--archive-session={shlex.quote(session_id)} '
+                f'--ended={shlex.quote(timestamp or "")} 2>/dev/null || {fallback}; }}'
+            )
 
-        args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
+        args = [SSH_BIN, *build_ssh_args(ssh_target, ssh_key, ssh_port)]
         args.extend([ssh_target, full_cmd])
 
-        logging.debug(f"Running: {' '.join(args)}")
+        if DEBUG_ON:
+            logging.debug("Running: %s", ' '.join(args))
 
-        result = subprocess.run(
+        # Only the exit status matters; stderr is decoded on failure only
+        result = _run_ssh(
             args,
-            capture_output=True,
-            text=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             timeout=SSH_TIMEOUT + 5
         )
 
         if result.returncode == 0:
-            logging.info(f"Session reset successfully on {ssh_target}")
+            logging.info("Session reset successfully on %s", ssh_target)
             return {"status": "success", "message": "Session reset"}
         else:
-            error = result.stderr.strip() or "Failed to reset session"
-            logging.error(f"Reset failed: {error}")
+            error = result.stderr.decode('utf-8', 'replace').strip() or "Failed to reset session"
+            logging.error("Reset failed: %s", error)
             return {"status": "error", "message": error}
 
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout resetting session on {ssh_target}")
+        logging.error("Timeout resetting session on %s", ssh_target)
         return {"status": "error", "message": "Connection timed out"}
     except Exception as e:
         logging.exception("Unexpected error in reset_session")
@@ -884,6 +1555,10 @@ def action_run_command(data):
     """
     Run a restricted command on the remote server via SSH.
     Security: Only allows plandrop-history commands.
+
+    With "stream": true, stdout is pushed as {"status": "partial", "req_id",
+    "output"} messages while the command runs, and the final reply carries
+    only stderr, so large exports are never held in memory.
     """
     ssh_target = data.get('ssh_target')
     remote_path = data.get('remote_path')
@@ -899,7 +1574,7 @@ def action_run_command(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
     # Security: Only allow plandrop-history commands
@@ -912,43 +1587,145 @@ def action_run_command(data):
     if not cmd_to_check.startswith('plandrop-history'):
         # Also allow python3 .plandrop/history.py as fallback
         if not (cmd_to_check.startswith('python3 ') and 'history.py' in cmd_to_check):
-            logging.warning(f"Blocked command: {command}")
+            logging.warning("Blocked command: %s", command)
             return {"status": "error", "message": "Only plandrop-history commands allowed"}
 
-    logging.info(f"Running command on {ssh_target}: {command[:100]}...")
+    logging.info("Running command on %s: %.100s...", ssh_target, command)
 
     try:
-        args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
+        args = [SSH_BIN, *build_ssh_args(ssh_target, ssh_key, ssh_port)]
         args.extend([ssh_target, command])
 
-        result = subprocess.run(
+        if data.get('stream'):
+            return _stream_command(args, data.get('req_id'), timeout=60)
+
+        result = _run_ssh(
             args,
-            capture_output=True,
-            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             timeout=60  # Allow longer timeout for history export
         )
 
+        # Decode once; stderr is usually empty
+        output = result.stdout.decode('utf-8', 'replace')
+        error = result.stderr.decode('utf-8', 'replace') if result.stderr else ''
+
         if result.returncode == 0:
             return {
                 "status": "ok",
-                "output": result.stdout,
-                "error": result.stderr
+                "output": output,
+                "error": error
             }
         else:
             return {
                 "status": "error",
-                "output": result.stdout,
-                "error": result.stderr or f"Exit code: {result.returncode}"
+                "output": output,
+                "error": error or f"Exit code: {result.returncode}"
             }
 
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout running command on {ssh_target}")
+        logging.error("Timeout running command on %s", ssh_target)
         return {"status": "error", "message": "Command timed out"}
     except Exception as e:
         logging.exception("Unexpected error in run_command")
         return {"status": "error", "message": str(e)}
 
 
+def _stream_command(args, req_id, timeout):
+    """
+    Run args, forwarding stdout as partial messages. Lines are batched up to
+    STREAM_BATCH_BYTES, and sent at most STREAM_BATCH_SECONDS after the
+    first one arrived, so a long export does not become thousands of tiny
+    frames and a line followed by a pause still goes out promptly.
+    """
+    proc = _spawn_ssh(args, stdin=subprocess.DEVNULL,
+                      stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    # Drain stderr on the side so a chatty command cannot fill the pipe
+    # and block while we are reading stdout
+    stderr_chunks = []
+    stderr_reader = threading.Thread(
+        target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True
+    )
+    stderr_reader.start()
+
+    # Read stdout on a thread too, so a pending batch can be flushed on
+    # time while the command is quiet; None marks EOF
+    lines = queue.Queue()
+
+    def read_lines():
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    line_reader = threading.Thread(target=read_lines, daemon=True)
+    line_reader.start()
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        proc.kill()
+
+    killer = threading.Timer(timeout, kill)
+    killer.start()
+
+    def flush(batch):
+        send_message({
+            "status": "partial",
+            "req_id": req_id,
+            "output": b''.join(batch).decode('utf-8', 'replace')
+        })
+
+    try:
+        batch = []
+        size = 0
+        deadline = None
+        while True:
+            try:
+                line = lines.get(
+                    timeout=None if deadline is None
+                    else max(0, deadline - time.monotonic())
+                )
+            except queue.Empty:
+                # The batch's interval passed with no new line
+                line = b''
+            if line is None:
+                break
+            if line:
+                batch.append(line)
+                size += len(line)
+                if deadline is None:
+                    deadline = time.monotonic() + STREAM_BATCH_SECONDS
+            if batch and (size >= STREAM_BATCH_BYTES or time.monotonic() >= deadline):
+                flush(batch)
+                batch = []
+                size = 0
+                deadline = None
+        if batch:
+            flush(batch)
+
+        returncode = proc.wait()
+    finally:
+        killer.cancel()
+        # If sending failed midway ssh is still running, blocked on a stdout
+        # pipe nobody reads; stop it so stderr reaches EOF
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        line_reader.join()
+        proc.stdout.close()
+        stderr_reader.join()
+
+    stderr = b''.join(stderr_chunks).decode('utf-8', 'replace')
+    if timed_out.is_set():
+        logging.error("Streamed command timed out")
+        return {"status": "error", "message": "Command timed out"}
+    if returncode == 0:
+        return {"status": "ok", "output": "", "error": stderr}
+    return {"status": "error", "output": "", "error": stderr or f"Exit code: {returncode}"}
+
+
 def action_interrupt(data):
     """
     Send interrupt signal to stop a running Claude Code task.
@@ -967,86 +1744,294 @@ def action_interrupt(data):
         ssh_target = validate_ssh_target(ssh_target)
         remote_path = validate_path(remote_path)
     except ValueError as e:
-        logging.warning(f"Input validation failed: {e}")
+        logging.warning("Input validation failed: %s", e)
         return {"status": "error", "message": str(e)}
 
     interrupt_path = f"{remote_path}/.plandrop/interrupt"
-    logging.info(f"Sending interrupt signal to {ssh_target}:{interrupt_path}")
+    logging.info("Sending interrupt signal to %s:%s", ssh_target, interrupt_path)
 
     try:
-        args = ['ssh'] + build_ssh_args(ssh_target, ssh_key, ssh_port)
+        args = [SSH_BIN, *build_ssh_args(ssh_target, ssh_key, ssh_port)]
         args.extend([ssh_target, f'touch {shlex.quote(interrupt_path)}'])
 
-        result = subprocess.run(
+        # Only the exit status matters; stderr is decoded on failure only
+        result = _run_ssh(
             args,
-            capture_output=True,
-            text=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             timeout=10
         )
 
         if result.returncode == 0:
-            logging.info(f"Interrupt signal sent successfully")
+            logging.info("Interrupt signal sent successfully")
             return {"status": "interrupt_sent"}
         else:
-            logging.error(f"Failed to send interrupt: {result.stderr}")
-            return {"status": "error", "message": result.stderr or f"Exit code: {result.returncode}"}
+            error = result.stderr.decode('utf-8', 'replace')
+            logging.error("Failed to send interrupt: %s", error)
+            return {"status": "error", "message": error or f"Exit code: {result.returncode}"}
 
     except subprocess.TimeoutExpired:
-        logging.error(f"Timeout sending interrupt to {ssh_target}")
+        logging.error("Timeout sending interrupt to %s", ssh_target)
         return {"status": "error", "message": "SSH connection timed out"}
     except Exception as e:
         logging.exception("Unexpected error in action_interrupt")
         return {"status": "error", "message": str(e)}
 
 
+def _stream_reader(plan_id, proc):
+    """
+    Forward each line of a tail -F process as a stream message.
+    Stops after the plan's result event, or when the process exits.
+    """
+    try:
+        for raw in proc.stdout:
+            line = raw.decode('utf-8', 'replace').rstrip('\n')
+            if not line:
+                continue
+            send_message({"status": "stream", "id": plan_id, "line": line})
+
+            # The result event is always the last line of a response file
+            if b'"result"' in raw:
+                try:
+                    event = _json_loads(raw)
+                except ValueError:
+                    continue
+                if isinstance(event, dict) and event.get('type') == 'result':
+                    break
+    except (OSError, ValueError) as e:
+        logging.warning("Stream for %s failed: %s", plan_id, e)
+    finally:
+        with _tail_lock:
+            if _tail_registry.get(plan_id) is proc:
+                del _tail_registry[plan_id]
+        _end_stream(proc)
+        logging.info("Stream for %s closed", plan_id)
+        try:
+            send_message({"status": "stream", "id": plan_id, "done": True})
+        except OSError:
+            pass
+
+
+def _end_stream(proc):
+    """
+    Stop a tail stream and wait for its ssh to exit. Closing ssh's stdin
+    makes the remote side kill its tail; terminating the local client alone
+    would leave the tail running on the server.
+    """
+    try:
+        proc.stdin.close()
+    except (OSError, ValueError):
+        pass
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.terminate()
+        proc.wait()
+
+
+def _stop_streams():
+    """Stop all running response streams."""
+    with _tail_lock:
+        procs = list(_tail_registry.values())
+        _tail_registry.clear()
+    # Signal every stream first so their remote sides exit in parallel
+    for proc in procs:
+        try:
+            proc.stdin.close()
+        except (OSError, ValueError):
+            pass
+    for proc in procs:
+        _end_stream(proc)
+
+
+def action_start_stream(data):
+    """
+    Follow a plan's response JSONL with tail -F over one long-lived SSH
+    channel. Lines are pushed as {"status": "stream", "id", "line"} messages
+    as they are written, and {"status": "stream", "id", "done": true} once
+    the result event is seen or the stream is stopped.
+    """
+    ssh_target = data.get('ssh_target')
+    remote_path = data.get('remote_path')
+    plan_id = data.get('plan_id')
+    ssh_key = data.get('ssh_key')
+    ssh_port = data.get('ssh_port')
+
+    if not ssh_target or not remote_path or not plan_id:
+        return {"status": "error", "message": "Missing ssh_target, remote_path, or plan_id"}
+
+    # Security: Validate inputs
+    try:
+        ssh_target = validate_ssh_target(ssh_target)
+        remote_path = validate_path(remote_path)
+        if not _PLAN_ID_RE.match(plan_id):
+            raise ValueError("Invalid plan_id format")
+    except ValueError as e:
+        logging.warning("Input validation failed: %s", e)
+        return {"status": "error", "message": str(e)}
+
+    response_file = f"{remote_path}/.plandrop/responses/{plan_id}.jsonl"
+
+    # Connecting is network-bound; do it before taking the registry lock,
+    # which stop_stream and every stream reader's cleanup also need
+    _ensure_master(ssh_target, ssh_key, ssh_port)
+
+    with _tail_lock:
+        proc = _tail_registry.get(plan_id)
+        if proc is not None and proc.poll() is None:
+            return {"status": "success", "message": "Already streaming"}
+
+        active = sum(1 for p in _tail_registry.values() if p.poll() is None)
+        if active >= MAX_STREAMS:
+            logging.warning("Refusing stream for %s: %d already active", plan_id, active)
+            return {"status": "error", "message": "Too many active streams"}
+
+        # tail -F waits for the file to appear and follows it from the start.
+        # It runs until our end of stdin closes, so stopping the stream
+        # also stops the remote tail (see _end_stream).
+        cmd = [SSH_BIN, *build_ssh_args(ssh_target, ssh_key, ssh_port), ssh_target,
+               f'tail -n +1 -F {shlex.quote(response_file)} 2>/dev/null & p=$!; '
+               f'cat >/dev/null; kill $p']
+        if DEBUG_ON:
+            logging.debug("Running: %s", ' '.join(cmd))
+
+        try:
+            proc = _spawn_ssh(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            logging.error("Starting stream failed: %s", e)
+            return {"status": "error", "message": str(e)}
+
+        _tail_registry[plan_id] = proc
+
+    threading.Thread(
+        target=_stream_reader, args=(plan_id, proc), daemon=True
+    ).start()
+
+    logging.info("Streaming responses: %s:%s", ssh_target, response_file)
+    return {"status": "success"}
+
+
+def action_stop_stream(data):
+    """Stop a response stream started by start_stream."""
+    plan_id = data.get('plan_id')
+
+    if not plan_id:
+        return {"status": "error", "message": "Missing plan_id"}
+
+    with _tail_lock:
+        proc = _tail_registry.pop(plan_id, None)
+
+    if proc is None:
+        return {"status": "success", "message": "Not streaming"}
+
+    # The reader thread then sees EOF and sends the done message
+    _end_stream(proc)
+    return {"status": "success"}
+
+
+# Action name -> handler. upload, poll_state, start_stream/stop_stream and
+# run_command's stream flag are opt-in: the bundled extension doesn't use
+# them yet (it sends offset to poll_responses and warmup on dashboard start).
+_ACTIONS = {
+    # V1 actions
+    'test_conn': action_test_conn,
+    'check_file': action_check_file,
+    'send_file': action_send_file,
+    'upload': action_upload,
+    'warmup': action_warmup,
+    # V2 actions
+    'init_queue': action_init_queue,
+    'send_plan': action_send_plan,
+    'poll_responses': action_poll_responses,
+    'read_heartbeat': action_read_heartbeat,
+    'poll_state': action_poll_state,
+    'start_stream': action_start_stream,
+    'stop_stream': action_stop_stream,
+    'write_settings': action_write_settings,
+    'read_session': action_read_session,
+    'reset_session': action_reset_session,
+    'run_command': action_run_command,
+    'interrupt': action_interrupt,
+}
+
+
 def handle_message(message):
     """Route message to appropriate action handler."""
     action = message.get('action')
 
-    logging.info(f"Handling action: {action}")
+    logging.debug("Handling action: %s", action)
 
-    # V1 actions
-    if action == 'test_conn':
-        return action_test_conn(message)
-    elif action == 'check_file':
-        return action_check_file(message)
-    elif action == 'send_file':
-        return action_send_file(message)
-    # V2 actions
-    elif action == 'init_queue':
-        return action_init_queue(message)
-    elif action == 'send_plan':
-        return action_send_plan(message)
-    elif action == 'poll_responses':
-        return action_poll_responses(message)
-    elif action == 'read_heartbeat':
-        return action_read_heartbeat(message)
-    elif action == 'write_settings':
-        return action_write_settings(message)
-    elif action == 'read_session':
-        return action_read_session(message)
-    elif action == 'reset_session':
-        return action_reset_session(message)
-    elif action == 'run_command':
-        return action_run_command(message)
-    elif action == 'interrupt':
-        return action_interrupt(message)
-    else:
-        logging.warning(f"Unknown action: {action}")
+    handler = _ACTIONS.get(action) if isinstance(action, str) else None
+    if handler is None:
+        logging.warning("Unknown action: %s", action)
         return {"status": "error", "message": f"Unknown action: {action}"}
+    return handler(message)
+
+
+def _handle_and_reply(message):
+    """Handle one message on a worker thread and tag the reply with its req_id."""
+    try:
+        response = handle_message(message)
+    except Exception as e:
+        logging.exception("Unexpected error handling message")
+        response = {"status": "error", "message": str(e)}
+
+    if isinstance(message, dict) and 'req_id' in message:
+        response['req_id'] = message['req_id']
+    return response
+
+
+def _ordered_writer(pending):
+    """Send replies to untagged requests in the order the requests arrived."""
+    while True:
+        future = pending.get()
+        if future is None:
+            return
+        send_message(future.result())
+
+
+def _send_reply(future):
+    try:
+        send_message(future.result())
+    except OSError as e:
+        logging.error("Failed to send reply: %s", e)
 
 
 def main():
-    """Main loop: read messages, process, respond."""
+    """
+    Main loop: read messages and hand them to a pool of workers.
+    Replies to requests carrying a req_id are sent as soon as they are ready;
+    older clients that rely on FIFO replies (no req_id) get them in order.
+    """
     logging.info("PlanDrop native host started")
-    logging.info(f"Python version: {sys.version}")
-    logging.info(f"Log file: {LOG_FILE}")
+    logging.info("Python version: %s", sys.version)
+    logging.info("Log file: %s", LOG_FILE)
+
+    if not os.path.isabs(SSH_BIN):
+        logging.error("ssh not found on PATH; remote actions will fail")
+
+    _grow_pipes()
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=MAX_WORKERS, thread_name_prefix='plandrop-worker'
+    )
+    pending = queue.Queue()
+    writer = threading.Thread(target=_ordered_writer, args=(pending,), daemon=True)
+    writer.start()
 
     try:
         while True:
             message = read_message()
-            response = handle_message(message)
-            send_message(response)
+            future = executor.submit(_handle_and_reply, message)
+            if isinstance(message, dict) and 'req_id' in message:
+                future.add_done_callback(_send_reply)
+            else:
+                pending.put(future)
     except KeyboardInterrupt:
         logging.info("Interrupted, exiting")
     except Exception as e:
@@ -1057,6 +2042,13 @@ def main():
         except:
             pass
         sys.exit(1)
+    finally:
+        # Let in-flight requests finish and their replies go out
+        executor.shutdown(wait=True)
+        pending.put(None)
+        writer.join()
+        _stop_streams()
+        _close_masters()
 
 
 if __name__ == '__main__':